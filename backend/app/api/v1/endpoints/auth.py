@@ -10,7 +10,7 @@ from typing import List, Optional
 from app.core.config import settings
 from app.core.security import (
     create_access_token,
-    get_password_hash,
+    get_password_hash_async,
     verify_password,
     get_current_user,
     get_current_active_user,
@@ -125,7 +125,7 @@ async def login(
                 db_user = UserInDB(
                     id=user.id,
                     email=user.email,
-                    hashed_password=get_password_hash(password),
+                    hashed_password=await get_password_hash_async(password),
                     full_name=user.user_metadata.get('name', user.email.split('@')[0]),
                     is_active=True,
                     is_superuser=user.role == 'admin',
@@ -376,10 +376,7 @@ async def read_users_me(
     """
     try:
         logger.info(f"Fetching current user: {current_user.email}")
-        # Ensure we don't return sensitive data
-        if hasattr(current_user, 'hashed_password'):
-            current_user_dict = current_user.dict(exclude={"hashed_password"})
-            return User(**current_user_dict)
+        # The User response model drops hashed_password on serialization
         return current_user
     except Exception as e:
         logger.error(f"Error fetching current user: {e}", exc_info=True)
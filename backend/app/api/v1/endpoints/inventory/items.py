@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from datetime import datetime
+from async_lru import alru_cache
 
 from app.core.security import get_current_active_user, get_admin_user, get_manager_user
 from app.core.supabase import supabase
@@ -13,6 +14,16 @@ from app.models.inventory import (
 
 router = APIRouter()
 
+@alru_cache(maxsize=32, ttl=60)
+async def fetch_units(skip: int, limit: int) -> List[Unit]:
+    """
+    Load a page of units, cached for a minute per (skip, limit).
+    
+    The unit create and delete endpoints clear the whole cache.
+    """
+    result = await supabase.query('units', 'select', {'limit': limit, 'offset': skip})
+    return [Unit(**unit) for unit in result.data]
+
 # Ingredients endpoints
 @router.get("/ingredients", response_model=List[Ingredient], summary="List ingredients")
 async def list_ingredients(
@@ -271,19 +282,7 @@ async def list_units(
         - List of unit objects
     """
     try:
-        # Build the query
-        query = supabase.client.table('units').select('*')
-        
-        # Apply pagination
-        query = query.range(skip, skip + limit - 1)
-        
-        # Execute the query
-        result = query.execute()
-        
-        # Convert to model objects
-        units = [Unit(**unit) for unit in result.data]
-        
-        return units
+        return await fetch_units(skip, limit)
     except Exception as e:
         print(f"Error retrieving units: {e}")
         raise HTTPException(
@@ -323,6 +322,8 @@ async def create_unit(
                 detail="Failed to create unit"
             )
         
+        fetch_units.cache_clear()
+        
         # Return the created unit
         created_unit = result.data[0]
         return Unit(**created_unit)
@@ -408,7 +409,8 @@ async def delete_unit(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Unit not found"
             )
-            
+        
+        fetch_units.cache_clear()
         return None  # 204 No Content
     except HTTPException:
         raise
@@ -75,19 +75,17 @@ async def create_transaction(
         # Get the created transaction ID
         transaction_id = result.data[0]['id']
         
-        # Process transaction items
-        for item_data in transaction.items:
-            item_data['transaction_id'] = transaction_id
-            item_data['created_at'] = datetime.utcnow().isoformat()
-            item_data['updated_at'] = item_data['created_at']
-            
-            # Insert transaction item
-            supabase.client.table('inventory_transaction_items').insert(item_data).execute()
+        # Insert all transaction items in one request
+        now = datetime.utcnow().isoformat()
+        await supabase.bulk_insert('inventory_transaction_items', [
+            {**item.model_dump(mode='json'), 'transaction_id': transaction_id, 'created_at': now, 'updated_at': now}
+            for item in transaction.items
+        ])
         
         # Update ingredient stock levels based on transaction type
-        for item_data in transaction.items:
-            ingredient_id = item_data['ingredient_id']
-            quantity = item_data['quantity']
+        for item in transaction.items:
+            ingredient_id = item.ingredient_id
+            quantity = item.quantity
             
             # Get current ingredient
             ingredient_result = supabase.client.table('ingredients').select('current_stock').eq('id', ingredient_id).single().execute()
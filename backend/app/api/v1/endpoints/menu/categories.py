@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from datetime import datetime
+from async_lru import alru_cache
 
 from app.core.security import get_current_active_user, get_admin_user, get_manager_user
 from app.core.supabase import supabase
@@ -8,6 +9,22 @@ from app.models.menu import MenuCategoryCreate, MenuCategoryUpdate, MenuCategory
 
 router = APIRouter()
 
+@alru_cache(maxsize=32, ttl=60)
+async def fetch_menu_categories(skip: int, limit: int, is_active: Optional[bool]) -> List[MenuCategory]:
+    """
+    Load a page of menu categories, cached for a minute per (skip, limit, is_active).
+    
+    Categories change rarely, so every write endpoint below clears the
+    whole cache instead of working out which pages it touched.
+    """
+    filters = {} if is_active is None else {'is_active': is_active}
+    result = await supabase.query('menu_categories', 'select', {
+        'filters': filters,
+        'limit': limit,
+        'offset': skip
+    })
+    return [MenuCategory(**category) for category in result.data]
+
 @router.get("/", response_model=List[MenuCategory], summary="List menu categories")
 async def list_categories(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -26,23 +43,7 @@ async def list_categories(
         - List of menu category objects
     """
     try:
-        # Build the query
-        query = supabase.client.table('menu_categories').select('*')
-        
-        # Apply filters
-        if is_active is not None:
-            query = query.eq('is_active', is_active)
-            
-        # Apply pagination
-        query = query.range(skip, skip + limit - 1)
-        
-        # Execute the query
-        result = query.execute()
-        
-        # Convert to model objects
-        categories = [MenuCategory(**category) for category in result.data]
-        
-        return categories
+        return await fetch_menu_categories(skip, limit, is_active)
     except Exception as e:
         print(f"Error retrieving categories: {e}")
         raise HTTPException(
@@ -83,6 +84,8 @@ async def create_category(
                 detail="Failed to create category"
             )
         
+        fetch_menu_categories.cache_clear()
+        
         # Return the created category
         created_category = result.data[0]
         return MenuCategory(**created_category)
@@ -167,6 +170,8 @@ async def update_category(
                 detail="Category not found"
             )
         
+        fetch_menu_categories.cache_clear()
+        
         # Return the updated category
         updated_category = result.data[0]
         return MenuCategory(**updated_category)
@@ -215,7 +220,8 @@ async def delete_category(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found"
             )
-            
+        
+        fetch_menu_categories.cache_clear()
         return None  # 204 No Content
     except HTTPException:
         raise
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from datetime import datetime
+from pydantic import TypeAdapter
 
 from app.core.security import get_current_active_user, get_admin_user, get_manager_user, get_staff_user
 from app.core.supabase import supabase
@@ -13,6 +14,9 @@ from app.models.pos import (
 
 router = APIRouter()
 
+# Built once at import; validates order_items rows in a single call
+ORDER_ITEMS_ADAPTER = TypeAdapter(List[OrderItem])
+
 # Tables endpoints
 @router.get("/tables", response_model=List[Table], summary="List all tables")
 async def list_tables(
@@ -251,7 +255,7 @@ async def list_orders(
             
             # Get order items
             items_result = supabase.client.table('order_items').select('*').eq('order_id', order_data['id']).execute()
-            order_data['items'] = [OrderItem(**item) for item in items_result.data] if items_result.data else []
+            order_data['items'] = ORDER_ITEMS_ADAPTER.validate_python(items_result.data or [])
             
             orders.append(Order(**order_data))
         
@@ -299,20 +303,16 @@ async def create_order(
         # Get the created order ID
         order_id = result.data[0]['id']
         
-        # Process order items
-        total_cost = 0
-        for item_data in order.items:
-            item_data['order_id'] = order_id
-            item_data['created_at'] = datetime.utcnow().isoformat()
-            item_data['updated_at'] = item_data['created_at']
-            
-            # Insert order item
-            item_result = supabase.client.table('order_items').insert(item_data).execute()
-            
-            # Add to total cost
-            if item_result.data and len(item_result.data) > 0:
-                item = item_result.data[0]
-                total_cost += item['unit_price'] * item['quantity']
+        # Insert all order items in one request
+        now = datetime.utcnow().isoformat()
+        items_data = [
+            {**item.model_dump(mode='json'), 'order_id': order_id, 'created_at': now, 'updated_at': now}
+            for item in order.items
+        ]
+        inserted_items = await supabase.bulk_insert('order_items', items_data)
+        
+        # Add to total cost
+        total_cost = sum(item['unit_price'] * item['quantity'] for item in inserted_items)
         
         # Update order with calculated total (this would typically happen elsewhere)
         # For now, just return the created order
@@ -328,7 +328,7 @@ async def create_order(
         order_data = order_result.data
         # Get order items
         items_result = supabase.client.table('order_items').select('*').eq('order_id', order_id).execute()
-        order_data['items'] = [OrderItem(**item) for item in items_result.data] if items_result.data else []
+        order_data['items'] = ORDER_ITEMS_ADAPTER.validate_python(items_result.data or [])
         
         # Update table status to occupied if needed
         supabase.client.table('tables').update({
@@ -377,7 +377,7 @@ async def get_order(
         
         # Get order items
         items_result = supabase.client.table('order_items').select('*').eq('order_id', order_id).execute()
-        order_data['items'] = [OrderItem(**item) for item in items_result.data] if items_result.data else []
+        order_data['items'] = ORDER_ITEMS_ADAPTER.validate_python(items_result.data or [])
         
         return Order(**order_data)
     except Exception as e:
@@ -440,7 +440,7 @@ async def update_order(
         order_data = updated_order_result.data
         # Get order items
         items_result = supabase.client.table('order_items').select('*').eq('order_id', order_id).execute()
-        order_data['items'] = [OrderItem(**item) for item in items_result.data] if items_result.data else []
+        order_data['items'] = ORDER_ITEMS_ADAPTER.validate_python(items_result.data or [])
         
         # If order status is updated to 'paid', update table status to 'dirty'
         if 'status' in update_data and update_data['status'] == 'paid':
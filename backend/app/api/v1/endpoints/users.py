@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import List, Optional, Dict, Any, Union
+from datetime import datetime, timezone
+from collections import defaultdict
+import asyncio
 import logging
 
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+
 from app.core.security import (
     get_current_user,
     get_current_active_user,
     get_admin_user,
     get_manager_user,
     get_staff_user,
+    get_password_hash_async,
     oauth2_scheme
 )
+from app.core.loaders import UserLoader, get_user_loader
 from app.core.supabase import supabase
 from app.models.user import User, UserUpdate, UserInDB, UserCreate, UserRole
 
@@ -19,6 +26,61 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Columns safe to return to any caller; the password hash is only fetched when needed
+PUBLIC_USER_COLS = "id,email,full_name,role,is_active,is_superuser,created_at,updated_at"
+ADMIN_USER_COLS = PUBLIC_USER_COLS + ",hashed_password"
+
+# Roles a manager may not view, besides their own profile
+_MANAGER_BLOCKED = frozenset({UserRole.ADMIN, UserRole.MANAGER})
+
+# Lets clients reuse a user payload briefly before revalidating with If-None-Match
+USER_CACHE_CONTROL = "private, max-age=30"
+
+# Short-lived cache of users by (user_id, columns). A GET from the admin UI
+# warms it for the PUT/DELETE that usually follows; writes pop their entries.
+# The cache is per process: under several gunicorn workers, the others keep
+# serving the old row (role, is_active included) for up to the TTL after a
+# write. Authentication doesn't read it (get_current_user queries by email),
+# so a deactivated user is still locked out immediately.
+USER_BY_ID_CACHE: TTLCache = TTLCache(maxsize=5000, ttl=10)
+# Per-user locks so concurrent misses for the same id share one query
+USER_BY_ID_LOCKS: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+# Requests holding or waiting on each lock; the lock is dropped at zero
+USER_BY_ID_LOCK_REFS: Dict[str, int] = defaultdict(int)
+
+# Built once at import; validates list_users rows in a single call
+USERS_ADAPTER = TypeAdapter(List[User])
+
+def _utcnow_iso() -> str:
+    """Current UTC time as an ISO 8601 string with microsecond precision."""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+def _invalidate_user(user_id: str) -> None:
+    """Drop every cached column set for a user after it has been written."""
+    for columns in (PUBLIC_USER_COLS, ADMIN_USER_COLS):
+        USER_BY_ID_CACHE.pop((user_id, columns), None)
+
+def _user_etag(user: Union[User, UserInDB]) -> str:
+    """Weak ETag for a user, derived from its ID and last update time."""
+    # Full precision, so two updates within the same second still differ
+    return f'W/"{user.id}-{user.updated_at.isoformat()}"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Return a 304 response if the client already holds this ETag.
+    
+    Otherwise set the ETag and Cache-Control headers on the outgoing
+    response and return None so the handler sends the full body.
+    """
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": USER_CACHE_CONTROL}
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = USER_CACHE_CONTROL
+    return None
+
 @router.get(
     "/me",
     response_model=User,
@@ -26,26 +88,27 @@ router = APIRouter()
     response_description="The current user's information"
 )
 async def read_users_me(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get the currently authenticated user's information.
     
+    Supports conditional requests: send the returned ETag back in
+    If-None-Match to get a 304 when the user has not changed. The auth
+    dependency has already read the user row by then, so a 304 saves
+    serialization and the response body, not the database lookup.
+    
     Returns:
         - User: The current user's information
     """
-    try:
-        # Remove sensitive data before returning
-        if hasattr(current_user, 'hashed_password'):
-            current_user_dict = current_user.dict(exclude={"hashed_password"})
-            return User(**current_user_dict)
-        return current_user
-    except Exception as e:
-        logger.error(f"Error fetching current user: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An error occurred while fetching user information"
-        )
+    not_modified = _not_modified(request, response, _user_etag(current_user))
+    if not_modified is not None:
+        return not_modified
+    
+    # The User response model drops hashed_password on serialization
+    return current_user
 
 @router.get(
     "/",
@@ -77,31 +140,19 @@ async def read_users(
         - List of user objects
     """
     try:
-        # Build the query
-        query = supabase.client.table('users').select('*')
-        
-        # Apply filters
-        if role:
-            query = query.eq('role', role.value)
-        if is_active is not None:
-            query = query.eq('is_active', is_active)
-            
-        # Apply pagination
-        query = query.range(skip, skip + limit - 1)
-        
-        # Execute the query
-        result = query.execute()
-        
-        # Filter out sensitive data
-        users = []
-        for user in result.data:
-            # Only include sensitive fields if admin
-            if current_user.role != UserRole.ADMIN:
-                user.pop('hashed_password', None)
-                user.pop('email_verified', None)
-            users.append(User(**user))
-            
-        return users
+        # Filtering and pagination run in the list_users SQL function
+        # (scripts/generate_sql.py), so this is one fixed-shape call
+        result = await supabase.async_client.rpc('list_users', {
+            'p_role': role.value if role else None,
+            'p_is_active': is_active,
+            'p_limit': limit,
+            'p_offset': skip
+        }).execute()
+
+        # A raw Response skips response_model, so validate the rows against
+        # User here; this also drops any column User doesn't declare
+        users = USERS_ADAPTER.validate_python(result.data or [])
+        return Response(content=USERS_ADAPTER.dump_json(users), media_type="application/json")
     except Exception as e:
         logger.error(f"Error retrieving users: {e}", exc_info=True)
         raise HTTPException(
@@ -117,7 +168,10 @@ async def read_users(
 )
 async def read_user(
     user_id: str,
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    user_loader: UserLoader = Depends(get_user_loader)
 ):
     """
     Get a specific user by ID.
@@ -126,36 +180,39 @@ async def read_user(
     - **Managers** can view staff and customer profiles
     - **Staff** can only view their own profile
     
+    Supports conditional requests via ETag / If-None-Match.
+    
     Parameters:
     - user_id: ID of the user to retrieve
     
     Returns:
         - User: The requested user's information
     """
-    # Check permissions
-    if current_user.id != user_id:
-        if current_user.role == UserRole.STAFF:
+    # Staff can only view themselves, so don't touch the database for them
+    if current_user.id != user_id and current_user.role == UserRole.STAFF:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this user"
+        )
+    
+    try:
+        # One fetch serves both the manager permission check and the response
+        user = await _get_user_by_id(user_id, user_loader)
+        
+        # Managers can only view staff and customers, not other managers or admins
+        if (
+            current_user.id != user_id
+            and current_user.role == UserRole.MANAGER
+            and user.role in _MANAGER_BLOCKED
+        ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this user"
             )
-        elif current_user.role == UserRole.MANAGER:
-            # Managers can only view staff and customers, not other managers or admins
-            target_user = await _get_user_by_id(user_id)
-            if target_user.role in [UserRole.ADMIN, UserRole.MANAGER]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not authorized to view this user"
-                )
-    
-    try:
-        user = await _get_user_by_id(user_id)
         
-        # Remove sensitive data if not admin
-        if current_user.role != UserRole.ADMIN:
-            if hasattr(user, 'hashed_password'):
-                user_dict = user.dict(exclude={"hashed_password"})
-                return User(**user_dict)
+        not_modified = _not_modified(request, response, _user_etag(user))
+        if not_modified is not None:
+            return not_modified
         
         return user
     except HTTPException:
@@ -175,7 +232,8 @@ async def read_user(
 )
 async def update_user_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    user_loader: UserLoader = Depends(get_user_loader)
 ):
     """
     Update current user information.
@@ -194,7 +252,7 @@ async def update_user_me(
     Returns:
         - User: The updated user information
     """
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True, mode='json')
     
     # Remove fields that shouldn't be updated through this endpoint
     update_data.pop('role', None)
@@ -202,11 +260,14 @@ async def update_user_me(
     
     # Handle password update
     if 'password' in update_data:
-        update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+        update_data['hashed_password'] = await get_password_hash_async(update_data.pop('password'))
+    
+    # Set here rather than relying on a trigger; the ETag is built from it
+    update_data['updated_at'] = _utcnow_iso()
     
     try:
         # Update user in database
-        result = supabase.client.table('users') \
+        result = await supabase.async_client.table('users') \
             .update(update_data) \
             .eq('id', current_user.id) \
             .execute()
@@ -218,14 +279,8 @@ async def update_user_me(
             )
         
         # Get updated user
-        updated_user = await _get_user_by_id(current_user.id)
-        
-        # Remove sensitive data before returning
-        if hasattr(updated_user, 'hashed_password'):
-            updated_user_dict = updated_user.dict(exclude={"hashed_password"})
-            return User(**updated_user_dict)
-            
-        return updated_user
+        _invalidate_user(current_user.id)
+        return await _get_user_by_id(current_user.id, user_loader)
     except HTTPException:
         raise
     except Exception as e:
@@ -254,22 +309,16 @@ async def delete_user_me(
         - 204 No Content on success
     """
     try:
-        # Soft delete by marking as inactive
-        result = supabase.client.table('users') \
-            .update({
-                'is_active': False,
-                'email': f"deleted_{current_user.id}@deleted.com",
-                'updated_at': datetime.utcnow().isoformat()
-            }) \
-            .eq('id', current_user.id) \
-            .execute()
+        # Soft delete by marking as inactive (see soft_delete_user in generate_sql.py)
+        result = await supabase.async_client.rpc('soft_delete_user', {'uid': current_user.id}).execute()
             
         if not result.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-            
+        
+        _invalidate_user(current_user.id)
         return None  # 204 No Content
     except HTTPException:
         raise
@@ -309,7 +358,7 @@ async def create_user(
     """
     try:
         # Check if user already exists
-        existing_user = supabase.client.table('users') \
+        existing_user = await supabase.async_client.table('users') \
             .select('email') \
             .eq('email', user.email) \
             .execute()
@@ -321,14 +370,14 @@ async def create_user(
             )
         
         # Prepare user data for database
-        user_data = user.dict()
-        user_data['hashed_password'] = get_password_hash(user_data.pop('password'))
+        user_data = user.model_dump(mode='json')
+        user_data['hashed_password'] = await get_password_hash_async(user_data.pop('password'))
         user_data['is_active'] = True
-        user_data['created_at'] = datetime.utcnow().isoformat()
+        user_data['created_at'] = _utcnow_iso()
         user_data['updated_at'] = user_data['created_at']
         
         # Insert new user into database
-        result = supabase.client.table('users') \
+        result = await supabase.async_client.table('users') \
             .insert(user_data) \
             .execute()
         
@@ -378,20 +427,20 @@ async def update_user(
         - User: The updated user object
     """
     try:
-        # Check if user exists
-        existing_user = await _get_user_by_id(user_id)
+        # No existence precheck: an UPDATE matching no row returns no data,
+        # which is reported as 404 below
         
         # Prepare update data
-        update_data = user_update.dict(exclude_unset=True)
+        update_data = user_update.model_dump(exclude_unset=True, mode='json')
         
         # Handle password update
         if 'password' in update_data:
-            update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+            update_data['hashed_password'] = await get_password_hash_async(update_data.pop('password'))
         
         # Update user in database
-        update_data['updated_at'] = datetime.utcnow().isoformat()
+        update_data['updated_at'] = _utcnow_iso()
         
-        result = supabase.client.table('users') \
+        result = await supabase.async_client.table('users') \
             .update(update_data) \
             .eq('id', user_id) \
             .execute()
@@ -402,6 +451,8 @@ async def update_user(
                 detail="User not found"
             )
         
+        _invalidate_user(user_id)
+        
         # Return the updated user (without password hash)
         updated_user = result.data[0]
         updated_user.pop('hashed_password', None)
@@ -442,25 +493,16 @@ async def delete_user(
         - 204 No Content on success
     """
     try:
-        # Check if user exists
-        existing_user = await _get_user_by_id(user_id)
-        
-        # Soft delete by marking as inactive
-        result = supabase.client.table('users') \
-            .update({
-                'is_active': False,
-                'email': f"deleted_{user_id}@deleted.com",
-                'updated_at': datetime.utcnow().isoformat()
-            }) \
-            .eq('id', user_id) \
-            .execute()
+        # Soft delete by marking as inactive (see soft_delete_user in generate_sql.py)
+        result = await supabase.async_client.rpc('soft_delete_user', {'uid': user_id}).execute()
         
         if not result.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-            
+        
+        _invalidate_user(user_id)
         return None  # 204 No Content
     except HTTPException:
         raise
@@ -472,36 +514,68 @@ async def delete_user(
         )
 
 # Helper function to get user by ID
-async def _get_user_by_id(user_id: str) -> UserInDB:
+async def _get_user_by_id(
+    user_id: str,
+    user_loader: UserLoader,
+    columns: str = PUBLIC_USER_COLS
+) -> Union[User, UserInDB]:
     """
     Get a user by ID from the database.
     
+    Results are cached for a few seconds in USER_BY_ID_CACHE, per worker
+    process, so another worker's write can take up to the TTL to show. On a miss,
+    concurrent callers for the same id wait on one lock and the first one
+    loads the row through the request's UserLoader, so several calls made
+    while handling one request are also batched into a single query.
+    
     Args:
         user_id: The ID of the user to retrieve
+        user_loader: The request-scoped loader from get_user_loader
+        columns: Columns to select; pass ADMIN_USER_COLS to include the password hash
         
     Returns:
-        UserInDB: The user object
+        User, or UserInDB when the password hash was requested
         
     Raises:
         HTTPException: If the user is not found
     """
+    key = (user_id, columns)
+    user = USER_BY_ID_CACHE.get(key)
+    if user is not None:
+        return user
+    
+    lock = USER_BY_ID_LOCKS[user_id]
+    USER_BY_ID_LOCK_REFS[user_id] += 1
     try:
-        result = supabase.client.table('users') \
-            .select('*') \
-            .eq('id', user_id) \
-            .single() \
-            .execute()
-        
-        if not result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+        async with lock:
+            # Another request may have filled the cache while we waited
+            user = USER_BY_ID_CACHE.get(key)
+            if user is not None:
+                return user
+            
+            row = await user_loader.load(user_id, columns)
             
-        return UserInDB(**result.data)
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+                
+            user = UserInDB(**row) if columns == ADMIN_USER_COLS else User(**row)
+            USER_BY_ID_CACHE[key] = user
+            return user
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving user {user_id}: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving the user"
         )
+    finally:
+        # lock.locked() is briefly False while a released lock passes to the
+        # next waiter, so count users of the lock instead
+        USER_BY_ID_LOCK_REFS[user_id] -= 1
+        if not USER_BY_ID_LOCK_REFS[user_id]:
+            del USER_BY_ID_LOCK_REFS[user_id]
+            USER_BY_ID_LOCKS.pop(user_id, None)
@@ -1,12 +1,16 @@
-from pydantic import Field
+from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+import json
 import os
-from typing import List
+from typing import FrozenSet
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file. Containers get their env from the
+# orchestrator and can set APP_LOAD_DOTENV=0 to skip the filesystem lookup.
+_LOAD_DOTENV = os.environ.get("APP_LOAD_DOTENV", "1") == "1"
+if _LOAD_DOTENV:
+    load_dotenv()
 
 class Settings(BaseSettings):
     # App settings
@@ -25,28 +29,38 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str = Field(default="", env="SUPABASE_ANON_KEY")
     SUPABASE_SERVICE_KEY: str = Field(default="", env="SUPABASE_SERVICE_KEY")
     SUPABASE_JWT_SECRET: str = Field(default="", env="SUPABASE_JWT_SECRET")
+    SUPABASE_MAX_CONNECTIONS: int = Field(default=50, env="SUPABASE_MAX_CONNECTIONS")
+    SUPABASE_KEEPALIVE: int = Field(default=300, env="SUPABASE_KEEPALIVE")
     
-    # CORS
-    CORS_ORIGINS: List[str] = Field(
-        default=[
-            "http://localhost:3000", 
-            "http://localhost:8000",
-            "https://annuti.vercel.app"
-        ],
-        description="List of allowed CORS origins"
+    # CORS. Read as a plain string so pydantic-settings doesn't try to
+    # JSON-decode it; CORS_ORIGINS below parses it once into a frozenset.
+    CORS_ORIGINS_RAW: str = Field(
+        default="http://localhost:3000,http://localhost:8000,https://annuti.vercel.app",
+        validation_alias="CORS_ORIGINS",
+        description="Allowed CORS origins, comma-separated or as a JSON list"
     )
     
+    @computed_field
+    @property
+    def CORS_ORIGINS(self) -> FrozenSet[str]:
+        raw = self.CORS_ORIGINS_RAW.strip()
+        origins = json.loads(raw) if raw.startswith("[") else raw.split(",")
+        return frozenset(origin.strip() for origin in origins if origin.strip())
+    
     # Pydantic v2 config
     model_config = SettingsConfigDict(
         case_sensitive=True,
-        env_file=".env",
+        env_file=".env" if _LOAD_DOTENV else None,
         env_file_encoding="utf-8",
-        extra="ignore"
+        extra="ignore",
+        # Read once at startup; assigning to a setting afterwards raises
+        frozen=True
     )
 
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
 
-# Create settings instance
+# Create settings instance. Values used per request (e.g. SECRET_KEY) are
+# copied into module constants where they are used, as in app.core.security.
 settings = get_settings()
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import Request
+
+from app.core.supabase import supabase
+
+logger = logging.getLogger(__name__)
+
+class UserLoader:
+    """
+    Request-scoped batch loader for rows of the users table.
+
+    Every load() issued during the same event-loop tick is queued and
+    resolved by a single `id=in.(...)` query per column set, so a request
+    path that looks up several users costs one round-trip instead of one
+    per user. Results are memoized for the lifetime of the loader, which
+    is one request (see get_user_loader).
+    """
+
+    def __init__(self):
+        self._futures: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._pending: Dict[str, List[str]] = {}
+        # Strong references to scheduled dispatches; the event loop only keeps
+        # weak ones, so an unreferenced task could be collected before it runs
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+
+    def load(self, user_id: str, columns: str) -> "asyncio.Future[Optional[dict]]":
+        """
+        Queue a lookup of one user row.
+
+        Args:
+            user_id: The ID of the user to load
+            columns: PostgREST select string for the row
+
+        Returns:
+            A future resolving to the row dict, or None if no user matched
+        """
+        key = (columns, user_id)
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+
+        if not self._pending:
+            # First load of this tick: dispatch once the caller yields
+            task = loop.create_task(self._dispatch())
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+        self._pending.setdefault(columns, []).append(user_id)
+        return future
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+
+        for columns, user_ids in pending.items():
+            try:
+                result = await supabase.query('users', 'select', {
+                    'select': columns,
+                    'in': {'id': user_ids}
+                })
+                rows = {str(row['id']): row for row in result.data or []}
+            except Exception as e:
+                logger.error(f"Error batch loading users {user_ids}: {e}", exc_info=True)
+                for user_id in user_ids:
+                    future = self._futures.pop((columns, user_id))
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for user_id in user_ids:
+                future = self._futures[(columns, user_id)]
+                if not future.done():
+                    future.set_result(rows.get(user_id))
+
+def get_user_loader(request: Request) -> UserLoader:
+    """
+    Dependency returning the UserLoader for the current request.
+
+    The loader is created on first use and kept on request.state so every
+    dependency and handler in the request shares the same batch.
+    """
+    loader = getattr(request.state, 'user_loader', None)
+    if loader is None:
+        loader = UserLoader()
+        request.state.user_loader = loader
+    return loader
@@ -0,0 +1,54 @@
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Network failures worth another attempt; anything else (bad query, auth
+# error, constraint violation) is raised immediately
+TRANSIENT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.PoolTimeout,
+    httpx.RemoteProtocolError,
+)
+
+def retry_db(
+    fn: Callable[..., T],
+    *args,
+    _max: int = 6,
+    _base: float = 0.2,
+    _cap: float = 10.0,
+    **kwargs
+) -> T:
+    """
+    Call a blocking Supabase operation, retrying transient network errors.
+
+    Waits grow exponentially from `_base` seconds up to `_cap`, with jitter
+    so concurrent callers don't retry in lockstep. For the one-shot scripts;
+    request handlers should fail fast instead.
+
+    Args:
+        fn: The operation, e.g. lambda: supabase.table('users').select('id').execute()
+        _max: Total number of attempts
+        _base: Delay before the first retry, in seconds
+        _cap: Upper bound on a single delay, in seconds
+
+    Returns:
+        Whatever fn returns
+    """
+    for attempt in range(_max):
+        try:
+            return fn(*args, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            if attempt == _max - 1:
+                raise
+            delay = min(_cap, _base * 2 ** attempt) * (0.5 + random.random())
+            logger.warning(f"Transient Supabase error ({e!r}); retrying in {delay:.1f}s")
+            time.sleep(delay)
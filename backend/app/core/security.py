@@ -7,6 +7,7 @@ __all__ = [
     'oauth2_scheme',
     'verify_password',
     'get_password_hash',
+    'get_password_hash_async',
     'create_access_token',
     'get_current_user',
     'get_current_active_user',
@@ -26,7 +27,9 @@ logger = logging.getLogger(__name__)
 
 try:
     # Import required modules after logging is configured
-    from jose import JWTError, jwt
+    import anyio
+    import jwt
+    from jwt import InvalidTokenError as JWTError
     from passlib.context import CryptContext
     from fastapi import Depends, HTTPException, status, Security
     from fastapi.security import OAuth2PasswordBearer, SecurityScopes
@@ -34,6 +37,7 @@ try:
     
     # Import app-specific modules
     from app.core.config import settings
+    from app.core.supabase import supabase
     from app.models.user import UserInDB, TokenData, UserRole, User
     
     logger.info("Successfully imported all dependencies in security.py")
@@ -42,13 +46,25 @@ except ImportError as e:
     logger.error(f"Error importing dependencies in security.py: {e}")
     raise
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Production keeps passlib's default cost of 12; other
+# environments use 10, which is about 4x cheaper per hash and verify.
+BCRYPT_ROUNDS = 12 if settings.APP_ENV == "production" else 10
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # JWT settings
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+# Resolved once so token verification doesn't rebuild them per request
+_KEY = settings.SECRET_KEY.encode()
+_ALGS = [ALGORITHM]
+_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Roles accepted by each role-based dependency
+ADMIN_ROLES = frozenset({UserRole.ADMIN})
+MANAGER_ROLES = frozenset({UserRole.ADMIN, UserRole.MANAGER})
+STAFF_ROLES = frozenset({UserRole.ADMIN, UserRole.MANAGER, UserRole.STAFF})
+
 class TokenPayload(BaseModel):
     sub: str
     scopes: List[str] = []
@@ -101,6 +117,15 @@ def get_password_hash(password: str) -> str:
             detail="Error hashing password"
         )
 
+async def get_password_hash_async(password: str) -> str:
+    """
+    Generate a password hash on the threadpool.
+    
+    bcrypt is CPU-bound and releases the GIL, so request handlers use this
+    instead of get_password_hash to keep the event loop responsive.
+    """
+    return await anyio.to_thread.run_sync(get_password_hash, password)
+
 def create_access_token(
     data: dict, 
     expires_delta: Optional[timedelta] = None,
@@ -121,7 +146,7 @@ def create_access_token(
         "scopes": scopes
     })
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_user(
@@ -140,17 +165,8 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        
-        # Get token scopes
-        token_scopes = payload.get("scopes", [])
-        token_data = TokenData(
-            username=username,
-            scopes=token_scopes
-        )
+        payload = jwt.decode(token, _KEY, algorithms=_ALGS, options=_DECODE_OPTIONS)
+        token_data = TokenData(email=payload["sub"])
         
     except (JWTError, ValidationError) as e:
         raise HTTPException(
@@ -161,18 +177,17 @@ async def get_current_user(
     
     try:
         # Get user from database
-        result = supabase.client.table('users') \
-            .select('*') \
-            .eq('email', token_data.username) \
-            .single() \
-            .execute()
+        result = await supabase.query('users', 'select', {
+            'filters': {'email': token_data.email},
+            'limit': 1
+        })
         
         if not result.data:
-            logger.warning(f"User not found: {token_data.username}")
+            logger.warning(f"User not found: {token_data.email}")
             raise credentials_exception
             
         # Create UserInDB instance
-        user_data = result.data
+        user_data = result.data[0]
         return UserInDB(**user_data)
         
     except JWTError as e:
@@ -191,7 +206,7 @@ def get_admin_user(current_user: UserInDB = Depends(get_current_user)) -> UserIn
     Dependency to get the current admin user.
     Raises HTTP 403 if the user is not an admin.
     """
-    if UserRole.ADMIN not in current_user.roles:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Insufficient permissions. Admin access required."
@@ -203,7 +218,7 @@ def get_manager_user(current_user: UserInDB = Depends(get_current_user)) -> User
     Dependency to get the current manager user.
     Raises HTTP 403 if the user is not at least a manager.
     """
-    if not any(role in current_user.roles for role in [UserRole.ADMIN, UserRole.MANAGER]):
+    if current_user.role not in MANAGER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Insufficient permissions. Manager or higher access required."
@@ -215,7 +230,7 @@ def get_staff_user(current_user: UserInDB = Depends(get_current_user)) -> UserIn
     Dependency to get the current staff user.
     Raises HTTP 403 if the user is not at least a staff member.
     """
-    if not any(role in current_user.roles for role in [UserRole.ADMIN, UserRole.MANAGER, UserRole.STAFF]):
+    if current_user.role not in STAFF_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Insufficient permissions. Staff or higher access required."
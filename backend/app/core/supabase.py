@@ -1,29 +1,283 @@
-from supabase import create_client
+from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import atexit
+import httpx
+from supabase import create_client, Client
+# supabase 2.4.1 doesn't re-export the async client from the package root
+from supabase._async.client import AsyncClient, create_client as acreate_client
 from app.core.config import settings
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
-# Initialize the Supabase client with service role for admin operations
-if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
-    raise ValueError("Supabase URL and Service Key must be set in environment variables")
-
-try:
-    # Initialize the Supabase client with service role
-    supabase = create_client(
-        settings.SUPABASE_URL, 
-        settings.SUPABASE_SERVICE_KEY
-    )
-    logger.info("Successfully initialized Supabase client with service role")
-except Exception as e:
-    logger.error(f"Failed to initialize Supabase client: {e}")
-    raise
+# Connection limits for the PostgREST sessions. By default connections are
+# kept alive for five minutes so steady traffic never pays for a new TLS
+# handshake; SUPABASE_MAX_CONNECTIONS and SUPABASE_KEEPALIVE tune both.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.SUPABASE_MAX_CONNECTIONS,
+    keepalive_expiry=settings.SUPABASE_KEEPALIVE
+)
+
+# Timeouts for the sync session; a dead host fails fast instead of hanging
+SYNC_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+@lru_cache(maxsize=256)
+def _render_select(select: str) -> str:
+    """Normalize a select list once per distinct shape (PostgREST rejects stray whitespace)."""
+    return ",".join(column.strip() for column in select.split(","))
+
+@lru_cache(maxsize=256)
+def _render_order(order: str) -> Tuple[str, bool]:
+    """Split an order spec like '-created_at' into (column, descending)."""
+    return order.lstrip('-'), order.startswith('-')
+
+def _require_settings() -> None:
+    if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
+        raise ValueError("Supabase URL and Service Key must be set in environment variables")
+
+class SupabaseClient:
+    """
+    Process-wide wrapper around the Supabase clients.
+
+    Nothing is created at import. `async_client` is created by connect()
+    in the FastAPI lifespan and backs query(), which awaits PostgREST
+    instead of blocking the event loop. The synchronous supabase-py
+    `client` is built on first access, for endpoints not yet moved to the
+    async client and for scripts. Attributes not defined here fall through
+    to the sync client, so `supabase.table` and `supabase.auth` keep working.
+    """
+
+    _instance: Optional["SupabaseClient"] = None
+
+    def __init__(self):
+        self._client: Optional[Client] = None
+        self.async_client: Optional[AsyncClient] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sync_http: Optional[httpx.Client] = None
+
+    @property
+    def client(self) -> Client:
+        """The sync client with service role for admin operations, created on first use."""
+        if self._client is None:
+            _require_settings()
+            self._client = create_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY
+            )
+
+            # Same swap as connect(): a bounded, keep-alive PostgREST session
+            # that retries failed connection attempts
+            postgrest = self._client.postgrest
+            default_session = postgrest.session
+            self._sync_http = httpx.Client(
+                base_url=default_session.base_url,
+                headers=default_session.headers,
+                timeout=SYNC_HTTP_TIMEOUT,
+                transport=httpx.HTTPTransport(retries=3, limits=HTTP_LIMITS)
+            )
+            postgrest.session = self._sync_http
+            default_session.close()
+            atexit.register(self._sync_http.close)
+            logger.info("Successfully initialized Supabase client with service role")
+        return self._client
+
+    @classmethod
+    def get_instance(cls) -> "SupabaseClient":
+        """Return the connected shared client; only valid after application startup."""
+        if cls._instance is None:
+            raise RuntimeError("Supabase client is not initialized; it is connected in the FastAPI lifespan")
+        return cls._instance
+
+    async def connect(self) -> None:
+        """
+        Create the async client and register this instance as the shared one.
+        Called once from the FastAPI lifespan.
+
+        The PostgREST session supabase-py builds is swapped for a pooled
+        HTTP/2 httpx client carrying the same base URL, headers and timeout,
+        so queries are multiplexed over a few long-lived connections.
+        """
+        if self.async_client is None:
+            _require_settings()
+            self.async_client = await acreate_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY
+            )
+
+            postgrest = self.async_client.postgrest
+            default_session = postgrest.session
+            self._http = httpx.AsyncClient(
+                base_url=default_session.base_url,
+                headers=default_session.headers,
+                timeout=default_session.timeout,
+                http2=True,
+                limits=HTTP_LIMITS
+            )
+            postgrest.session = self._http
+            await default_session.aclose()
+            logger.info("Successfully initialized async Supabase client")
+        SupabaseClient._instance = self
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP session. Called from the FastAPI lifespan on shutdown."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self.async_client = None
+        SupabaseClient._instance = None
+
+    async def query(
+        self,
+        table: str,
+        action: str = 'select',
+        query_params: Optional[Dict[str, Any]] = None,
+        data: Any = None
+    ):
+        """
+        Run a simple PostgREST query on the async client.
+
+        Args:
+            table: Table to query
+            action: One of select, insert, update, upsert or delete
+            query_params: Optional keys:
+                - select: column list for select (default '*')
+                - filters: {column: value} equality filters
+                - in: {column: [values]} membership filters
+                - order: column to order by, prefixed with '-' for descending
+                - limit / offset: pagination by row offset; only for admin
+                  views that need to jump to a page
+                - after: keyset pagination; returns rows with id greater than
+                  this value, ordered by id. Callers hand back the last
+                  row's id as the next cursor.
+            data: Row or rows for insert, update and upsert
+
+        Returns:
+            The postgrest APIResponse
+        """
+        if self.async_client is None:
+            raise RuntimeError("Async Supabase client is not connected; call connect() at startup")
+
+        params = query_params or {}
+        builder = self.async_client.table(table)
+
+        if action == 'select':
+            query = builder.select(_render_select(params.get('select', '*')))
+        elif action == 'insert':
+            query = builder.insert(data)
+        elif action == 'update':
+            query = builder.update(data)
+        elif action == 'upsert':
+            query = builder.upsert(data)
+        elif action == 'delete':
+            query = builder.delete()
+        else:
+            raise ValueError(f"Unsupported query action: {action}")
+
+        for column, value in params.get('filters', {}).items():
+            query = query.eq(column, value)
+        for column, values in params.get('in', {}).items():
+            query = query.in_(column, values)
+
+        after = params.get('after')
+        order = params.get('order')
+        if after is not None:
+            # Seek past the cursor on the primary key instead of scanning an offset
+            query = query.gt('id', after).order('id')
+        elif order:
+            column, desc = _render_order(order)
+            query = query.order(column, desc=desc)
+
+        limit = params.get('limit')
+        offset = params.get('offset')
+        if limit is not None and offset and after is None:
+            query = query.range(offset, offset + limit - 1)
+        elif limit is not None:
+            query = query.limit(limit)
+
+        return await query.execute()
+
+    async def bulk_insert(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many rows with one PostgREST request per chunk.
+
+        Each chunk is a single multi-row INSERT ... RETURNING, so it lands
+        atomically; chunks are sent concurrently and are independent.
+
+        Args:
+            table: Table to insert into
+            rows: Rows to insert
+            chunk_size: Maximum rows per request
+
+        Returns:
+            The inserted rows, in the order they were given
+        """
+        if not rows:
+            return []
+        if self.async_client is None:
+            raise RuntimeError("Async Supabase client is not connected; call connect() at startup")
+
+        results = await asyncio.gather(*(
+            self.async_client.table(table).insert(rows[i:i + chunk_size]).execute()
+            for i in range(0, len(rows), chunk_size)
+        ))
+        return [row for result in results for row in result.data or []]
+
+    async def bulk_delete(self, table: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Delete many rows by id with a single `id=in.(...)` request.
+
+        Returns:
+            The deleted rows
+        """
+        if not ids:
+            return []
+        if self.async_client is None:
+            raise RuntimeError("Async Supabase client is not connected; call connect() at startup")
+
+        result = await self.async_client.table(table).delete().in_('id', ids).execute()
+        return result.data or []
+
+    async def bulk_update_orders(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply per-order status changes in one UPDATE ... FROM statement.
+
+        Args:
+            updates: [{'id': ..., 'status': ...}, ...]; see bulk_update_orders
+                in scripts/generate_sql.py
+
+        Returns:
+            The updated order rows
+        """
+        if not updates:
+            return []
+        if self.async_client is None:
+            raise RuntimeError("Async Supabase client is not connected; call connect() at startup")
+
+        result = await self.async_client.rpc('bulk_update_orders', {'p': updates}).execute()
+        return result.data or []
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not set on the wrapper itself
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+# Shared wrapper; cheap to build, connected during application startup
+supabase = SupabaseClient()
 
 def test_connection() -> bool:
     """Test the Supabase connection with a simple query."""
     try:
-        result = supabase.table('users').select('*').limit(1).execute()
+        # Only reachability matters; don't pull row data (password hashes included)
+        supabase.table('users').select('id').limit(1).execute()
         logger.info("Successfully connected to Supabase")
         return True
     except Exception as e:
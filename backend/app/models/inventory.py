@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class TransactionType(str, Enum):
@@ -28,8 +28,7 @@ class Unit(UnitBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class IngredientBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -59,8 +58,18 @@ class Ingredient(IngredientBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class InventoryTransactionItemBase(BaseModel):
+    ingredient_id: str
+    quantity: float = Field(..., gt=0)
+    unit_cost: float = Field(..., ge=0)
+    total_cost: float = Field(..., ge=0)
+    expiry_date: Optional[date] = None
+    batch_number: Optional[str] = None
+
+class InventoryTransactionItemCreate(InventoryTransactionItemBase):
+    pass
 
 class InventoryTransactionBase(BaseModel):
     type: TransactionType
@@ -69,7 +78,7 @@ class InventoryTransactionBase(BaseModel):
     user_id: str
 
 class InventoryTransactionCreate(InventoryTransactionBase):
-    items: List[dict]  # List of transaction items
+    items: List[InventoryTransactionItemCreate] = Field(..., min_length=1)
 
 class InventoryTransactionUpdate(BaseModel):
     notes: Optional[str] = None
@@ -80,30 +89,17 @@ class InventoryTransaction(InventoryTransactionBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
-class InventoryTransactionItemBase(BaseModel):
-    ingredient_id: str
-    quantity: float = Field(..., gt=0)
-    unit_cost: float = Field(..., ge=0)
-    total_cost: float = Field(..., ge=0)
-    expiry_date: Optional[str] = None  # Date in ISO format
-    batch_number: Optional[str] = None
-
-class InventoryTransactionItemCreate(InventoryTransactionItemBase):
-    pass
+    model_config = ConfigDict(from_attributes=True)
 
 class InventoryTransactionItemUpdate(BaseModel):
     quantity: Optional[float] = Field(None, gt=0)
     unit_cost: Optional[float] = Field(None, ge=0)
     total_cost: Optional[float] = Field(None, ge=0)
-    expiry_date: Optional[str] = None
+    expiry_date: Optional[date] = None
     batch_number: Optional[str] = None
 
 class InventoryTransactionItem(InventoryTransactionItemBase):
     id: str
     transaction_id: str
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True)
\ No newline at end of file
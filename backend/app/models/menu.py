@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -22,8 +22,7 @@ class MenuCategory(MenuCategoryBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MenuItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -56,8 +55,7 @@ class MenuItem(MenuItemBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RecipeIngredientBase(BaseModel):
     ingredient_id: str
@@ -78,8 +76,7 @@ class RecipeIngredient(RecipeIngredientBase):
     id: str
     recipe_id: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RecipeBase(BaseModel):
     instructions: Optional[str] = None
@@ -102,5 +99,4 @@ class Recipe(RecipeBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, ForwardRef
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, ForwardRef, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -28,11 +28,22 @@ class PaymentMethod(str, Enum):
     TELEBIRR = "telebirr"
     CHAPA = "chapa"
 
+# Allowed status values, validated as Literals rather than regex patterns
+TableStatus = Literal["available", "occupied", "reserved", "dirty"]
+OrderItemStatus = Literal["new", "preparing", "ready", "served"]
+# Note the API accepts "cancelled" here while OrderStatus spells it "canceled"
+OrderStatusValue = Literal["new", "preparing", "ready", "served", "completed", "cancelled"]
+PaymentTxnStatus = Literal["pending", "completed", "failed"]
+
+# Shared config for models built from database rows
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
 # Table Models
 class TableBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=50)
     capacity: int = Field(..., gt=0)
-    status: str = Field(default="available", pattern=r"^(available|occupied|reserved|dirty)$")
+    status: TableStatus = "available"
     section_id: Optional[str] = None
 
 class TableCreate(TableBase):
@@ -41,17 +52,14 @@ class TableCreate(TableBase):
 class TableUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=50)
     capacity: Optional[int] = Field(None, gt=0)
-    status: Optional[str] = Field(None, pattern=r"^(available|occupied|reserved|dirty)$")
+    status: Optional[TableStatus] = None
     section_id: Optional[str] = None
 
-class Table(TableBase):
+class Table(TableBase, ORMModel):
     id: str
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 # Forward reference for Order to avoid circular imports
 Order = ForwardRef('Order')
 
@@ -61,7 +69,7 @@ class OrderItemBase(BaseModel):
     quantity: int = Field(..., gt=0)
     unit_price: float = Field(..., ge=0)
     notes: Optional[str] = None
-    status: str = Field(default="new", pattern=r"^(new|preparing|ready|served)$")
+    status: OrderItemStatus = "new"
 
 class OrderItemCreate(OrderItemBase):
     pass
@@ -70,73 +78,71 @@ class OrderItemUpdate(BaseModel):
     quantity: Optional[int] = Field(None, gt=0)
     unit_price: Optional[float] = Field(None, ge=0)
     notes: Optional[str] = None
-    status: Optional[str] = Field(None, pattern=r"^(new|preparing|ready|served)$")
+    status: Optional[OrderItemStatus] = None
+
+class OrderItem(OrderItemBase, ORMModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
-class OrderItem(OrderItemBase):
     id: str
     order_id: str
     order: 'Order' = None
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 # Order Models
 class OrderBase(BaseModel):
     table_id: Optional[str] = None
     customer_name: Optional[str] = None
     customer_phone: Optional[str] = None
     order_type: OrderType = OrderType.DINE_IN
-    status: str = Field(default="new", pattern=r"^(new|preparing|ready|served|completed|cancelled)$")
+    status: OrderStatusValue = "new"
     notes: Optional[str] = None
     total_amount: float = Field(..., ge=0)
     tax_amount: float = Field(default=0.0, ge=0)
     discount_amount: float = Field(default=0.0, ge=0)
 
 class OrderCreate(OrderBase):
-    items: List[OrderItemCreate] = Field(..., min_items=1)
+    items: List[OrderItemCreate] = Field(..., min_length=1)
 
 class OrderUpdate(BaseModel):
-    status: Optional[str] = Field(None, pattern=r"^(new|preparing|ready|served|completed|cancelled)$")
+    status: Optional[OrderStatusValue] = None
     notes: Optional[str] = None
     customer_name: Optional[str] = None
     customer_phone: Optional[str] = None
     order_type: Optional[OrderType] = None
 
-class Order(OrderBase):
+class Order(OrderBase, ORMModel):
     id: str
     created_at: datetime
     updated_at: datetime
     items: List[OrderItem] = []
 
-    class Config:
-        from_attributes = True
-
-# Update forward references
-OrderItem.update_forward_refs()
-
 # Payment Models
 class PaymentBase(BaseModel):
     order_id: str
     amount: float = Field(..., gt=0)
     payment_method: PaymentMethod
     transaction_id: Optional[str] = None
-    status: str = Field(default="pending", pattern=r"^(pending|completed|failed)$")
+    status: PaymentTxnStatus = "pending"
     notes: Optional[str] = None
 
 class PaymentCreate(PaymentBase):
     pass
 
 class PaymentUpdate(BaseModel):
-    status: Optional[str] = Field(None, pattern=r"^(pending|completed|failed)$")
+    status: Optional[PaymentTxnStatus] = None
     notes: Optional[str] = None
 
-class Payment(PaymentBase):
+class Payment(PaymentBase, ORMModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     created_at: datetime
     updated_at: datetime
     order: Order = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+# Resolve the OrderItem -> Order forward reference and build every validator
+# that depends on it now, so the first request doesn't pay for it
+OrderItem.model_rebuild(force=True)
+Order.model_rebuild(force=True)
+Payment.model_rebuild(force=True)
@@ -1,9 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 class SalesSummaryBase(BaseModel):
-    date: str  # Format: YYYY-MM-DD
+    date: date
     total_sales: float = Field(..., ge=0)
     total_tax: float = Field(..., ge=0)
     total_discount: float = Field(..., ge=0)
@@ -27,28 +27,30 @@ class SalesSummary(SalesSummaryBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MenuItemSalesReport(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     menu_item_id: str
     menu_item_name: str
     quantity_sold: int = Field(..., ge=0)
     revenue: float = Field(..., ge=0)
     cost: float = Field(..., ge=0)
-    profit: float = Field(..., ge=0)
-    profit_margin: float = Field(..., ge=0)  # Percentage
+    # Negative when an item sells below cost
+    profit: float
+    profit_margin: float  # Percentage
 
 class DailySalesReport(BaseModel):
-    date: str
+    date: date
     total_sales: float
     total_orders: int
     avg_order_value: float
     top_selling_items: List[MenuItemSalesReport]
 
 class WeeklySalesReport(BaseModel):
-    week_start: str  # Format: YYYY-MM-DD
-    week_end: str    # Format: YYYY-MM-DD
+    week_start: date
+    week_end: date
     total_sales: float
     total_orders: int
     avg_order_value: float
@@ -63,11 +65,13 @@ class MonthlySalesReport(BaseModel):
 
 class EmployeePerformanceReport(BaseModel):
     employee_id: str
-    employee_name: str
+    # users.full_name is nullable
+    employee_name: Optional[str] = None
     total_orders_handled: int
     total_sales: float
     avg_order_value: float
-    date_range: str  # Format: YYYY-MM-DD to YYYY-MM-DD
+    start_date: date
+    end_date: date
 
 class InventoryVarianceReport(BaseModel):
     ingredient_id: str
@@ -76,7 +80,8 @@ class InventoryVarianceReport(BaseModel):
     actual_count: float
     variance: float
     variance_percentage: float
-    date_range: str  # Format: YYYY-MM-DD to YYYY-MM-DD
+    start_date: date
+    end_date: date
 
 class WasteReport(BaseModel):
     ingredient_id: str
@@ -84,7 +89,14 @@ class WasteReport(BaseModel):
     quantity_wasted: float
     cost: float
     reason: str
-    date: str  # Format: YYYY-MM-DD
+    date: date
+
+class LowStockItem(BaseModel):
+    # Built straight from ingredients rows, where the key is "id"
+    ingredient_id: str = Field(..., validation_alias=AliasChoices('ingredient_id', 'id'))
+    name: str
+    current_stock: float
+    min_stock: float
 
 class DashboardSummary(BaseModel):
     total_sales: float
@@ -94,5 +106,14 @@ class DashboardSummary(BaseModel):
     total_expenses: float
     net_profit: float
     top_selling_items: List[MenuItemSalesReport]
-    low_stock_items: List[dict]  # Simplified for now
-    date_range: str  # Format: YYYY-MM-DD to YYYY-MM-DD
\ No newline at end of file
+    low_stock_items: List[LowStockItem]
+    start_date: date
+    end_date: date
+
+# Validates a whole result set of ingredients rows in one call
+LOW_STOCK_ADAPTER = TypeAdapter(List[LowStockItem])
+
+# Report RPC rows are validated in one call per result set, then dumped to JSON
+DAILY_SALES_ADAPTER = TypeAdapter(List[DailySalesReport])
+EMPLOYEE_PERFORMANCE_ADAPTER = TypeAdapter(List[EmployeePerformanceReport])
+MENU_ITEM_SALES_ADAPTER = TypeAdapter(List[MenuItemSalesReport])
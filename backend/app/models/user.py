@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, validator, constr
-from typing import Optional, List, Literal
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Optional
 from datetime import datetime
 from enum import Enum
 
@@ -32,17 +32,14 @@ class UserInDB(UserBase):
     updated_at: datetime
     hashed_password: str
 
-    class Config:
-        from_attributes = True
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class User(UserBase):
     id: str
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Token(BaseModel):
     access_token: str
@@ -1,12 +1,14 @@
 import sys
 import os
 from pathlib import Path
+from typing import Optional
 
 # Add the project root to the Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.core.config import settings
 from app.core.security import get_password_hash
+from app.core.retry import retry_db
 from app.core.supabase import supabase
 from app.models.user import UserRole
 import logging
@@ -15,36 +17,68 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_admin_user(email: str, password: str, full_name: str = "Admin User"):
-    """Create an admin user in the database."""
+_ADMIN_ROLE = UserRole.ADMIN.value
+
+def create_admin_user(email: str, password: Optional[str], full_name: str = "Admin User"):
+    """
+    Create the admin user in Supabase auth and public.users if it is missing.
+
+    Safe to run on every deploy and from several containers at once: an
+    existing user is left untouched (its password may have been changed by an
+    operator), and the public.users row is written with ON CONFLICT (email)
+    DO NOTHING. The password is only needed when the user has to be created.
+    """
     try:
-        logger.info(f"Attempting to create admin user: {email}")
+        logger.info(f"Ensuring admin user exists: {email}")
         
         # Check if user already exists
-        result = supabase.client.table('users').select('*').eq('email', email).execute()
-        if result.data and len(result.data) > 0:
-            logger.warning(f"User with email {email} already exists")
+        result = retry_db(lambda: supabase.client.table('users').select('id')
+                          .eq('email', email).limit(1).execute())
+        
+        if result.data:
+            logger.info(f"Admin user {email} already exists")
             return {"status": "exists", "message": f"User with email {email} already exists"}
         
-        # Hash the password
-        hashed_password = get_password_hash(password)
+        if not password:
+            logger.error("Admin user is missing and ADMIN_PASSWORD is not set")
+            return {"status": "error", "message": "ADMIN_PASSWORD is required to create the admin user"}
+        
+        # Create auth user
+        auth_response = retry_db(supabase.auth.admin.create_user, {
+            "email": email,
+            "password": password,
+            "email_confirm": True,
+            "user_metadata": {
+                "name": full_name
+            }
+        })
+        
+        if not auth_response.user:
+            logger.error("Failed to create admin user: No auth user returned")
+            return {"status": "error", "message": "Failed to create admin user: No auth user returned"}
         
         # Create user data
         user_data = {
+            "id": str(auth_response.user.id),
             "email": email,
-            "hashed_password": hashed_password,
+            "hashed_password": get_password_hash(password),
             "full_name": full_name,
             "is_active": True,
             "is_superuser": True,
-            "role": UserRole.ADMIN.value
+            "role": _ADMIN_ROLE
         }
         
-        # Insert user into database
-        result = supabase.client.table('users').insert(user_data).execute()
+        # INSERT ... ON CONFLICT (email) DO NOTHING, so a concurrent bootstrap
+        # that got here first wins instead of failing this one
+        result = retry_db(lambda: supabase.client.table('users').upsert(
+            user_data,
+            on_conflict='email',
+            ignore_duplicates=True
+        ).execute())
         
-        if not result.data or len(result.data) == 0:
-            logger.error("Failed to create admin user: No data returned from database")
-            return {"status": "error", "message": "Failed to create admin user: No data returned from database"}
+        if not result.data:
+            logger.info(f"Admin user {email} was created concurrently")
+            return {"status": "exists", "message": f"User with email {email} already exists"}
         
         logger.info(f"Successfully created admin user: {email}")
         return {
@@ -61,15 +95,15 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Create an admin user")
-    parser.add_argument("--email", required=True, help="Admin email")
-    parser.add_argument("--password", required=True, help="Admin password (at least 8 characters)")
-    parser.add_argument("--name", default="Admin User", help="Admin full name")
+    parser.add_argument("--email", default=os.getenv("ADMIN_EMAIL", "admin@example.com"), help="Admin email")
+    parser.add_argument("--password", default=os.getenv("ADMIN_PASSWORD"), help="Admin password (at least 8 characters); only used when creating the user")
+    parser.add_argument("--name", default=os.getenv("ADMIN_NAME", "Admin"), help="Admin full name")
     
     args = parser.parse_args()
     
-    if len(args.password) < 8:
+    if args.password is not None and len(args.password) < 8:
         print("Error: Password must be at least 8 characters long")
         sys.exit(1)
     
-    result = create_admin_user(args.email, args.password, args.name)
-    print(result)
+    # create_admin_user logs its own outcome
+    create_admin_user(args.email, args.password, args.name)
@@ -45,6 +45,167 @@ CREATE TABLE IF NOT EXISTS public.user_profiles (
 CREATE INDEX IF NOT EXISTS idx_users_email ON public.users (email);
 CREATE INDEX IF NOT EXISTS idx_refresh_tokens_token ON public.refresh_tokens (token);
 CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user_id ON public.refresh_tokens (user_id);
+CREATE INDEX IF NOT EXISTS idx_users_role_active ON public.users (role) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON public.users (created_at DESC);
+
+-- Filtered, paginated user listing for the admin API (GET /users).
+-- Returns each row as JSON with the password hash stripped server-side.
+CREATE OR REPLACE FUNCTION public.list_users(
+    p_role TEXT DEFAULT NULL,
+    p_is_active BOOLEAN DEFAULT NULL,
+    p_limit INT DEFAULT 100,
+    p_offset INT DEFAULT 0
+)
+RETURNS SETOF JSONB
+LANGUAGE sql STABLE
+AS $$
+    SELECT to_jsonb(u) - 'hashed_password' - 'password_hash'
+    FROM public.users u
+    WHERE (p_role IS NULL OR u.role = p_role)
+      AND (p_is_active IS NULL OR u.is_active = p_is_active)
+    ORDER BY u.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+$$;
+
+-- Soft delete for the users API: deactivate and free up the email in one
+-- UPDATE. Returns the user's id, or NULL when no user matched.
+CREATE OR REPLACE FUNCTION public.soft_delete_user(uid UUID)
+RETURNS UUID
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE public.users
+    SET is_active = false,
+        email = 'deleted_' || id || '@deleted.com',
+        updated_at = now()
+    WHERE id = uid
+    RETURNING id;
+$$;
+
+-- Batch order status changes: p is a JSON array of {"id", "status"} objects.
+-- Used by SupabaseClient.bulk_update_orders.
+CREATE OR REPLACE FUNCTION public.bulk_update_orders(p JSONB)
+RETURNS SETOF public.orders
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE public.orders o
+    SET status = u.status,
+        updated_at = now()
+    FROM jsonb_to_recordset(p) AS u(id UUID, status TEXT)
+    WHERE o.id = u.id
+    RETURNING o.*;
+$$;
+
+-- Report aggregates for app/api/v1/endpoints/reports.py. Each returns rows
+-- already in the shape of the matching report model. Date ranges are
+-- inclusive of both ends.
+CREATE OR REPLACE FUNCTION public.report_sales_totals(p_from DATE, p_to DATE)
+RETURNS TABLE (total_sales NUMERIC, total_orders BIGINT, avg_order_value NUMERIC)
+LANGUAGE sql STABLE
+AS $$
+    SELECT COALESCE(SUM(o.total_amount), 0),
+           COUNT(o.id),
+           COALESCE(AVG(o.total_amount), 0)
+    FROM public.orders o
+    WHERE o.created_at >= p_from AND o.created_at < p_to + 1;
+$$;
+
+CREATE OR REPLACE FUNCTION public.report_daily_sales(p_from DATE, p_to DATE)
+RETURNS TABLE ("date" DATE, total_sales NUMERIC, total_orders BIGINT, avg_order_value NUMERIC)
+LANGUAGE sql STABLE
+AS $$
+    SELECT d::date,
+           COALESCE(SUM(o.total_amount), 0),
+           COUNT(o.id),
+           COALESCE(AVG(o.total_amount), 0)
+    FROM generate_series(p_from, p_to, interval '1 day') AS d
+    LEFT JOIN public.orders o
+        ON o.created_at >= d AND o.created_at < d + interval '1 day'
+    GROUP BY d
+    ORDER BY d;
+$$;
+
+CREATE OR REPLACE FUNCTION public.report_menu_item_sales(p_from DATE, p_to DATE, p_limit INT DEFAULT NULL)
+RETURNS TABLE (
+    menu_item_id UUID, menu_item_name TEXT, quantity_sold BIGINT,
+    revenue NUMERIC, cost NUMERIC, profit NUMERIC, profit_margin NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT s.menu_item_id, s.menu_item_name, s.quantity_sold,
+           s.revenue, s.cost, s.revenue - s.cost,
+           CASE WHEN s.revenue > 0 THEN (s.revenue - s.cost) / s.revenue * 100 ELSE 0 END
+    FROM (
+        SELECT oi.menu_item_id,
+               mi.name::TEXT AS menu_item_name,
+               SUM(oi.quantity)::BIGINT AS quantity_sold,
+               SUM(oi.unit_price * oi.quantity)::NUMERIC AS revenue,
+               SUM(oi.quantity * COALESCE(mi.cost, 0))::NUMERIC AS cost
+        FROM public.order_items oi
+        JOIN public.menu_items mi ON mi.id = oi.menu_item_id
+        WHERE oi.created_at >= p_from AND oi.created_at < p_to + 1
+        GROUP BY oi.menu_item_id, mi.name
+    ) s
+    ORDER BY s.quantity_sold DESC
+    LIMIT p_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION public.report_daily_menu_item_sales(p_from DATE, p_to DATE)
+RETURNS TABLE (
+    "date" DATE, menu_item_id UUID, menu_item_name TEXT, quantity_sold BIGINT,
+    revenue NUMERIC, cost NUMERIC, profit NUMERIC, profit_margin NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT s.day, s.menu_item_id, s.menu_item_name, s.quantity_sold,
+           s.revenue, s.cost, s.revenue - s.cost,
+           CASE WHEN s.revenue > 0 THEN (s.revenue - s.cost) / s.revenue * 100 ELSE 0 END
+    FROM (
+        SELECT oi.created_at::date AS day,
+               oi.menu_item_id,
+               mi.name::TEXT AS menu_item_name,
+               SUM(oi.quantity)::BIGINT AS quantity_sold,
+               SUM(oi.unit_price * oi.quantity)::NUMERIC AS revenue,
+               SUM(oi.quantity * COALESCE(mi.cost, 0))::NUMERIC AS cost
+        FROM public.order_items oi
+        JOIN public.menu_items mi ON mi.id = oi.menu_item_id
+        WHERE oi.created_at >= p_from AND oi.created_at < p_to + 1
+        GROUP BY 1, oi.menu_item_id, mi.name
+    ) s
+    ORDER BY s.day, s.quantity_sold DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION public.report_employee_sales(p_from DATE, p_to DATE)
+RETURNS TABLE (
+    employee_id UUID, employee_name TEXT, total_orders_handled BIGINT,
+    total_sales NUMERIC, avg_order_value NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT o.user_id,
+           u.full_name::TEXT,
+           COUNT(o.id),
+           COALESCE(SUM(o.total_amount), 0),
+           COALESCE(AVG(o.total_amount), 0)
+    FROM public.orders o
+    JOIN public.users u ON u.id = o.user_id
+    WHERE o.created_at >= p_from AND o.created_at < p_to + 1
+    GROUP BY o.user_id, u.full_name;
+$$;
+
+-- Run a batch of SQL statements in one call; used by scripts/init_db.py to
+-- create the tables in a single round-trip. Only the service role may call it.
+CREATE OR REPLACE FUNCTION public.exec_sql(sql TEXT)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    EXECUTE sql;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.exec_sql(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.exec_sql(TEXT) TO service_role;
 
 -- Create a function to update the updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -1,159 +1,160 @@
+import logging
+import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Tuple
+
+# Plain messages on stdout; LOGLEVEL=DEBUG shows the per-step progress lines
+logging.basicConfig(level=os.getenv('LOGLEVEL', 'INFO'), format='%(message)s', stream=sys.stdout)
+logger = logging.getLogger(__name__)
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-# Load environment variables from .env file
-load_dotenv(project_root / '.env')
+# backend/.env is loaded by app.core.config on import
 
+from app.core.retry import retry_db
 from app.core.supabase import supabase
 from app.core.config import settings
 
+# bcrypt digest (cost 12) of the default admin password "Admin@123", computed
+# once offline so each run doesn't spend a bcrypt hash on a constant. Set
+# ADMIN_PASSWORD_HASH to a digest of your own password to override it.
+DEFAULT_ADMIN_PASSWORD_HASH = "$2b$12$MPEY91CSUnWMLfrm9ErFwuaqAmmckbkb.fqXAb7E.ymUSPYAn21Wa"
+
+# DDL for the tables this script sets up, built once at import
+
+# Users table
+_USERS_DDL = """
+CREATE TABLE IF NOT EXISTS public.users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email VARCHAR(255) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    full_name VARCHAR(255),
+    role VARCHAR(50) NOT NULL DEFAULT 'user',
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+"""
+
+# Refresh tokens table
+_REFRESH_TOKENS_DDL = """
+CREATE TABLE IF NOT EXISTS public.refresh_tokens (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    token VARCHAR(255) UNIQUE NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+"""
+
+# User profiles table
+_USER_PROFILES_DDL = """
+CREATE TABLE IF NOT EXISTS public.user_profiles (
+    id UUID PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
+    phone VARCHAR(50),
+    address TEXT,
+    avatar_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+"""
+
+_SQL_STATEMENTS: Tuple[str, ...] = (_USERS_DDL, _REFRESH_TOKENS_DDL, _USER_PROFILES_DDL)
+_ALL_DDL = "\n".join(_SQL_STATEMENTS)
+
 def create_tables():
     """Create necessary tables in Supabase."""
-    print("🔄 Creating database tables...")
+    logger.info("🔄 Creating database tables...")
     
-    # Create users table
-    users_table = """
-    CREATE TABLE IF NOT EXISTS public.users (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        email VARCHAR(255) UNIQUE NOT NULL,
-        password_hash VARCHAR(255) NOT NULL,
-        full_name VARCHAR(255),
-        role VARCHAR(50) NOT NULL DEFAULT 'user',
-        is_active BOOLEAN DEFAULT true,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
-    );
-    """
-    
-    # Create refresh_tokens table
-    refresh_tokens_table = """
-    CREATE TABLE IF NOT EXISTS public.refresh_tokens (
-        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-        user_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
-        token VARCHAR(255) UNIQUE NOT NULL,
-        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
-    );
-    """
-    
-    # Create user_profiles table
-    user_profiles_table = """
-    CREATE TABLE IF NOT EXISTS public.user_profiles (
-        id UUID PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
-        phone VARCHAR(50),
-        address TEXT,
-        avatar_url TEXT,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
-        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
-    );
-    """
+    # Run all the DDL in one round-trip through the exec_sql function from
+    # scripts/generate_sql.py. Projects set up before it existed fall back to
+    # printing the SQL for the dashboard.
+    try:
+        logger.info("🔨 Creating tables through the exec_sql RPC...")
+        retry_db(lambda: supabase.rpc('exec_sql', {'sql': _ALL_DDL}).execute())
+    except Exception as e:
+        logger.warning(f"⚠️ Could not run exec_sql, falling back to manual setup: {e}")
+    else:
+        logger.info("✅ Tables created")
+        create_default_admin()
+        return
     
+    # One probe answers everything below: is the users table already there?
     try:
-        # Execute the SQL statements using the SQL editor API
-        print("🔨 Creating users table...")
-        supabase.query('users', 'select', {'filters': {'limit': 0}})
-        
-        # Create tables using raw SQL
-        print("🔨 Creating tables with raw SQL...")
-        sql_statements = [
-            users_table,
-            refresh_tokens_table,
-            user_profiles_table
-        ]
-        
-        # Execute each SQL statement
-        for sql in sql_statements:
-            try:
-                # This is a workaround since direct SQL execution isn't available in the client
-                # We'll need to use the Supabase dashboard to run these SQL statements
-                print(f"⚠️ Please run the following SQL in your Supabase SQL editor:")
-                print("-" * 80)
-                print(sql.strip())
-                print("-" * 80)
-                print("\n")
-            except Exception as e:
-                print(f"⚠️ Error executing SQL: {e}")
-        
-        # Create tables through the API if possible
-        try:
-            # Create users table through the API
-            print("🔨 Creating users table through API...")
-            supabase.client.table('users').select('*').limit(1).execute()
-        except Exception as e:
-            print(f"⚠️ Could not create users table through API: {e}")
-            print("   Please create the tables using the SQL provided above.")
-        
-        print("✅ Database initialization script completed!")
-        print("\nNext steps:")
-        print("1. Go to your Supabase dashboard")
-        print("2. Open the SQL Editor")
-        print("3. Create a new query")
-        print("4. Copy and paste the SQL statements shown above")
-        print("5. Run the query to create the tables")
-        print("\nAfter creating the tables, run this script again to create the default admin user.")
-        
-        # Only try to create admin if tables exist
-        try:
-            # Check if users table exists
-            result = supabase.table('users').select('*').limit(1).execute()
-            if not hasattr(result, 'error'):
-                print("\n🔍 Users table exists. Creating default admin user...")
-                create_default_admin()
-        except Exception as e:
-            print(f"⚠️ Could not check if tables exist: {e}")
-            print("   Please create the tables first using the SQL provided above.")
-        
+        retry_db(lambda: supabase.table('users').select('id').limit(0).execute())
+        users_table_exists = True
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
-        sys.exit(1)
+        logger.debug("Users table probe failed: %s", e)
+        users_table_exists = False
+    
+    for sql in _SQL_STATEMENTS:
+        # Direct SQL execution isn't available without exec_sql, so these
+        # have to be run from the Supabase dashboard
+        logger.warning("⚠️ Please run the following SQL in your Supabase SQL editor:")
+        logger.info("-" * 80)
+        logger.info(sql.strip())
+        logger.info("-" * 80)
+    
+    if not users_table_exists:
+        logger.warning("⚠️ The users table doesn't exist yet")
+        logger.info("   Please create the tables using the SQL provided above.")
+    
+    logger.info("✅ Database initialization script completed!")
+    logger.info("\nNext steps:")
+    logger.info("1. Go to your Supabase dashboard")
+    logger.info("2. Open the SQL Editor")
+    logger.info("3. Create a new query")
+    logger.info("4. Copy and paste the SQL statements shown above")
+    logger.info("5. Run the query to create the tables")
+    logger.info("\nAfter creating the tables, run this script again to create the default admin user.")
+    
+    # Only try to create admin if tables exist
+    if users_table_exists:
+        logger.debug("🔍 Users table exists. Creating default admin user...")
+        create_default_admin()
 
 def create_default_admin():
     """Create a default admin user if it doesn't exist."""
-    from passlib.context import CryptContext
-    
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    password_hash_override = os.getenv('ADMIN_PASSWORD_HASH')
     admin_email = "admin@bendine.com"
     admin_password = "Admin@123"  # In production, this should be set via environment variables
     
+    admin_user = {
+        'email': admin_email,
+        'password_hash': password_hash_override or DEFAULT_ADMIN_PASSWORD_HASH,
+        'full_name': 'Admin User',
+        'role': 'admin',
+        'is_active': True
+    }
+    
     try:
-        # Check if admin user already exists
-        result = supabase.table('users').select('*').eq('email', admin_email).execute()
+        # INSERT ... ON CONFLICT (email) DO NOTHING: one round-trip, and safe
+        # to run concurrently. No rows come back if the admin already existed.
+        result = retry_db(lambda: supabase.table('users').upsert(
+            admin_user,
+            on_conflict='email',
+            ignore_duplicates=True
+        ).execute())
         
-        if not result.data:
-            # Create admin user
-            hashed_password = pwd_context.hash(admin_password)
-            
-            admin_user = {
-                'email': admin_email,
-                'password_hash': hashed_password,
-                'full_name': 'Admin User',
-                'role': 'admin',
-                'is_active': True
-            }
-            
-            # Insert admin user
-            result = supabase.table('users').insert(admin_user).execute()
-            
-            if result.data:
-                print(f"✅ Created default admin user with email: {admin_email}")
-                print(f"🔑 Default password: {admin_password}")
-                print("⚠️ Please change this password after first login!")
+        if result.data:
+            logger.info(f"✅ Created default admin user with email: {admin_email}")
+            if not password_hash_override:
+                logger.info(f"🔑 Default password: {admin_password}")
+                logger.warning("⚠️ Please change this password after first login!")
         else:
-            print("ℹ️ Admin user already exists")
+            logger.info("ℹ️ Admin user already exists")
             
     except Exception as e:
-        print(f"❌ Error creating admin user: {e}")
+        logger.error(f"❌ Error creating admin user: {e}")
 
 if __name__ == "__main__":
-    print("🚀 Starting database initialization...")
-    print(f"🔗 Connecting to Supabase project: {settings.SUPABASE_URL}")
+    logger.info("🚀 Starting database initialization...")
+    logger.info(f"🔗 Connecting to Supabase project: {settings.SUPABASE_URL}")
     
     create_tables()
     
-    print("✨ Database initialization complete!")
+    logger.info("✨ Database initialization complete!")
@@ -2,11 +2,11 @@ import sys
 import os
 import asyncio
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Add the parent directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from app.core.retry import retry_db
 from app.core.supabase import supabase
 from app.core.config import settings
 import logging
@@ -24,20 +24,22 @@ async def create_admin_user():
         
         # Check if user already exists
         try:
-            result = supabase.auth.admin.list_users()
-            existing_user = next((user for user in result.users if user.email == admin_email), None)
+            # public.users shares its id with the auth user and is indexed on
+            # email, so this replaces a list_users() scan of every auth user
+            result = retry_db(lambda: supabase.table('users').select('id').eq('email', admin_email).limit(1).execute())
+            existing_user = result.data[0] if result.data else None
             
             if existing_user:
                 logger.info(f"Admin user {admin_email} already exists")
                 # Update password if needed
-                supabase.auth.admin.update_user_by_id(existing_user.id, {"password": admin_password})
+                retry_db(supabase.auth.admin.update_user_by_id, existing_user['id'], {"password": admin_password})
                 logger.info("Admin password updated")
                 return
         except Exception as e:
             logger.warning(f"Error checking for existing user: {e}")
 
         # Create the admin user
-        user = supabase.auth.admin.create_user({
+        user = retry_db(supabase.auth.admin.create_user, {
             "email": admin_email,
             "password": admin_password,
             "email_confirm": True,
@@ -59,7 +61,8 @@ async def create_admin_user():
             'role': 'admin'
         }
         
-        supabase.table('users').upsert(db_user).execute()
+        # ON CONFLICT (email) DO NOTHING, so a rerun or a concurrent setup is harmless
+        retry_db(lambda: supabase.table('users').upsert(db_user, on_conflict='email', ignore_duplicates=True).execute())
         logger.info("Admin user added to public.users table")
         
     except Exception as e:
@@ -67,10 +70,5 @@ async def create_admin_user():
         raise
 
 if __name__ == "__main__":
-    # Load environment variables
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        load_dotenv(env_path)
-    
-    # Run the async function
+    # Run the async function; backend/.env is loaded by app.core.config on import
     asyncio.run(create_admin_user())